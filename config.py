@@ -1,7 +1,14 @@
+import copy
+import mmap
 import os
-import yaml
 from pathlib import Path
-from utils import get_config_dir, get_data_dir, get_cache_dir
+from utils import get_config_dir, get_data_dir, get_cache_dir, yaml_load, yaml_dump
+
+# Below this size mapping the file costs more than reading it
+_MMAP_MIN_SIZE = 4096
+
+# Parsed configs keyed by (path, mtime_ns) so repeated Config() calls skip the parse
+_CONFIG_CACHE = {}
 
 class Config:
     DEFAULT_CONFIG = {
@@ -75,6 +82,7 @@ class Config:
             "monitoring": {
                 "enabled": True,
                 "interval_seconds": 60,
+                "network_interval_seconds": 300,
                 "metrics": ["cpu", "memory", "disk", "network"],
             },
         },
@@ -89,6 +97,7 @@ class Config:
         self.config_dir = Path(get_config_dir())
         self.config_file = self.config_dir / "config.yaml"
         self.config = self._load_config()
+        self._config_yaml_cache = None
 
     def _load_config(self):
         """Load configuration from file or create default"""
@@ -98,29 +107,48 @@ class Config:
         if not self.config_file.exists():
             return self._create_default_config()
 
-        with open(self.config_file, 'r') as f:
-            user_config = yaml.safe_load(f)
-            return self._merge_configs(self.DEFAULT_CONFIG, user_config)
+        stat = self.config_file.stat()
+        cache_key = (str(self.config_file), stat.st_mtime_ns)
+        if cache_key in _CONFIG_CACHE:
+            return copy.deepcopy(_CONFIG_CACHE[cache_key])
+
+        with open(self.config_file, 'rb') as f:
+            if stat.st_size < _MMAP_MIN_SIZE:
+                user_config = yaml_load(f)
+            else:
+                # Let the parser read large configs straight from the page cache
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    user_config = yaml_load(mm)
+        merged = self._merge_configs(self.DEFAULT_CONFIG, user_config)
+        _CONFIG_CACHE[cache_key] = copy.deepcopy(merged)
+        return merged
 
     def _create_default_config(self):
         """Create default configuration file"""
         os.makedirs(self.config_dir, exist_ok=True)
         with open(self.config_file, 'w') as f:
-            yaml.dump(self.DEFAULT_CONFIG, f, default_flow_style=False)
+            yaml_dump(self.DEFAULT_CONFIG, f)
         return self.DEFAULT_CONFIG
 
     def _merge_configs(self, default, user):
-        """Recursively merge user config with default config"""
+        """Merge user config with default config"""
         merged = default.copy()
         
         if not user:
             return merged
-            
-        for key, value in user.items():
-            if key in merged and isinstance(merged[key], dict) and isinstance(value, dict):
-                merged[key] = self._merge_configs(merged[key], value)
-            else:
-                merged[key] = value
+        
+        # Walk nested sections with an explicit stack, copying only the
+        # default sections the user actually overrides
+        stack = [(merged, user)]
+        while stack:
+            target, overrides = stack.pop()
+            for key, value in overrides.items():
+                base = target.get(key)
+                if isinstance(base, dict) and isinstance(value, dict):
+                    target[key] = base.copy()
+                    stack.append((target[key], value))
+                else:
+                    target[key] = value
                 
         return merged
 
@@ -130,20 +158,35 @@ class Config:
             return self.config.get(section, {}).get(key)
         return self.config.get(section)
 
+    def dumped(self):
+        """Get the configuration serialized as YAML"""
+        if self._config_yaml_cache is None:
+            self._config_yaml_cache = yaml_dump(self.config)
+        return self._config_yaml_cache
+
     def set(self, section, key, value):
         """Set configuration value"""
+        self._config_yaml_cache = None
         if section not in self.config:
             self.config[section] = {}
         self.config[section][key] = value
         self._save_config()
 
+    def _invalidate_cache(self):
+        """Drop cached entries for this config file"""
+        path = str(self.config_file)
+        for key in [k for k in _CONFIG_CACHE if k[0] == path]:
+            del _CONFIG_CACHE[key]
+
     def _save_config(self):
         """Save configuration to file"""
+        self._invalidate_cache()
         os.makedirs(self.config_dir, exist_ok=True)
         with open(self.config_file, 'w') as f:
-            yaml.dump(self.config, f, default_flow_style=False)
+            yaml_dump(self.config, f)
 
     def reset_to_default(self):
         """Reset configuration to default values"""
         self.config = self.DEFAULT_CONFIG.copy()
+        self._config_yaml_cache = None
         self._save_config()
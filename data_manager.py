@@ -1,15 +1,25 @@
-import json
 import csv
+import itertools
 import os
 import sqlite3
+from contextlib import contextmanager
 from datetime import datetime
-import yaml
+from utils import yaml_dump, json_dumps, json_loads
+
+# Kept as exact constant strings so sqlite3's statement cache reuses the prepared statements
+_INSERT_SCAN = '''INSERT INTO ip_scans (ip, country, city, isp, details, timestamp)
+                  VALUES (?, ?, ?, ?, ?, ?)'''
+_INSERT_NETWORK_STATS = '''INSERT INTO network_stats (bytes_sent, bytes_recv, connections, timestamp)
+                           VALUES (?, ?, ?, ?)'''
+
+# Formats export_data can stream rows to
+EXPORT_FORMATS = ("json", "csv", "yaml")
 
 class DataManager:
-    def __init__(self, data_dir="data"):
+    def __init__(self, data_dir="data", db_name="nettrackr.db"):
         self.data_dir = data_dir
         self._ensure_data_dir()
-        self.db_path = os.path.join(data_dir, "nettrackr.db")
+        self.db_path = os.path.join(data_dir, db_name)
         self._init_database()
 
     def _ensure_data_dir(self):
@@ -19,8 +29,16 @@ class DataManager:
 
     def _init_database(self):
         """Initialize SQLite database"""
-        conn = sqlite3.connect(self.db_path)
-        c = conn.cursor()
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None,
+                                    cached_statements=512)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript('''PRAGMA journal_mode=WAL;
+                                   PRAGMA synchronous=NORMAL;
+                                   PRAGMA cache_size=-64000;
+                                   PRAGMA mmap_size=268435456;
+                                   PRAGMA temp_store=MEMORY;
+                                   PRAGMA busy_timeout=5000;''')
+        c = self.conn.cursor()
         
         # Create tables
         c.execute('''CREATE TABLE IF NOT EXISTS ip_scans
@@ -29,7 +47,13 @@ class DataManager:
                      country TEXT,
                      city TEXT,
                      isp TEXT,
+                     details TEXT,
                      timestamp DATETIME)''')
+
+        # Databases created before the full lookup payload was stored lack this column
+        columns = {row['name'] for row in c.execute('PRAGMA table_info(ip_scans)')}
+        if 'details' not in columns:
+            c.execute('ALTER TABLE ip_scans ADD COLUMN details TEXT')
         
         c.execute('''CREATE TABLE IF NOT EXISTS network_stats
                     (id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -37,105 +61,141 @@ class DataManager:
                      bytes_recv INTEGER,
                      connections INTEGER,
                      timestamp DATETIME)''')
-        
-        conn.commit()
-        conn.close()
+
+        c.execute('CREATE INDEX IF NOT EXISTS idx_ip_scans_ts ON ip_scans(timestamp)')
+        c.execute('CREATE INDEX IF NOT EXISTS idx_net_ts ON network_stats(timestamp)')
+        c.execute('CREATE INDEX IF NOT EXISTS idx_ip_scans_ip ON ip_scans(ip, timestamp DESC)')
+
+    def close(self):
+        """Close the database connection"""
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+    @contextmanager
+    def _transaction(self):
+        """Run the enclosed statements in a single explicit transaction"""
+        c = self.conn.cursor()
+        c.execute("BEGIN")
+        try:
+            yield c
+        except Exception:
+            c.execute("ROLLBACK")
+            raise
+        c.execute("COMMIT")
 
     def save_scan(self, scan_data):
         """Save IP scan data to database"""
-        conn = sqlite3.connect(self.db_path)
-        c = conn.cursor()
-        
-        c.execute('''INSERT INTO ip_scans (ip, country, city, isp, timestamp)
-                    VALUES (?, ?, ?, ?, ?)''',
-                    (scan_data.get('ip'),
-                     scan_data.get('country'),
-                     scan_data.get('city'),
-                     scan_data.get('isp'),
-                     datetime.now()))
-        
-        conn.commit()
-        conn.close()
+        self.save_scans([scan_data])
+
+    def save_scans(self, rows):
+        """Save a batch of IP scans in one transaction, keeping each full lookup payload"""
+        now = datetime.now()
+        with self._transaction() as c:
+            c.executemany(_INSERT_SCAN,
+                          [(r.get('ip') or r.get('query'),
+                            r.get('country'),
+                            r.get('city'),
+                            r.get('isp'),
+                            json_dumps(r).decode(),
+                            now) for r in rows])
 
     def save_network_stats(self, stats):
         """Save network statistics to database"""
-        conn = sqlite3.connect(self.db_path)
-        c = conn.cursor()
-        
-        c.execute('''INSERT INTO network_stats 
-                    (bytes_sent, bytes_recv, connections, timestamp)
-                    VALUES (?, ?, ?, ?)''',
-                    (stats.get('bytes_sent'),
-                     stats.get('bytes_recv'),
-                     stats.get('connections'),
-                     datetime.now()))
-        
-        conn.commit()
-        conn.close()
+        self.save_network_stats_batch([stats])
+
+    def save_network_stats_batch(self, rows):
+        """Save a batch of network statistics samples in one transaction"""
+        now = datetime.now()
+        with self._transaction() as c:
+            c.executemany(_INSERT_NETWORK_STATS,
+                          [(r.get('bytes_sent'),
+                            r.get('bytes_recv'),
+                            r.get('connections'),
+                            now) for r in rows])
 
-    def export_data(self, data, format="json", filename=None):
-        """Export data in various formats"""
+    def export_data(self, row_iter, format="json", filename=None):
+        """Export rows in various formats, streaming them from any iterable"""
         if filename is None:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             filename = f"nettrackr_report_{timestamp}"
 
         filepath = os.path.join(self.data_dir, filename)
+        row_iter = iter(row_iter)
 
         if format == "json":
-            with open(f"{filepath}.json", 'w') as f:
-                json.dump(data, f, indent=4)
+            with open(f"{filepath}.json", 'wb') as f:
+                f.write(b'[\n')
+                for i, row in enumerate(row_iter):
+                    if i:
+                        f.write(b',\n')
+                    f.write(json_dumps(row, indent=True))
+                f.write(b'\n]\n')
             return f"{filepath}.json"
 
         elif format == "csv":
             with open(f"{filepath}.csv", 'w', newline='') as f:
-                writer = csv.DictWriter(f, fieldnames=data[0].keys())
-                writer.writeheader()
-                writer.writerows(data)
+                first = next(row_iter, None)
+                if first is not None:
+                    writer = csv.DictWriter(f, fieldnames=first.keys())
+                    writer.writeheader()
+                    writer.writerows(itertools.chain([first], row_iter))
             return f"{filepath}.csv"
 
         elif format == "yaml":
             with open(f"{filepath}.yaml", 'w') as f:
-                yaml.dump(data, f)
+                yaml_dump(list(row_iter), f)
             return f"{filepath}.yaml"
 
+        raise ValueError(f"Unsupported export format: {format}")
+
+    def _iter_rows(self, query):
+        """Yield query results as dicts straight from the cursor"""
+        for row in self.conn.execute(query):
+            yield dict(row)
+
+    def iter_scans(self):
+        """Iterate over all IP scans, oldest first"""
+        return self._iter_rows('''SELECT id, ip, country, city, isp, timestamp FROM ip_scans
+                                  ORDER BY timestamp''')
+
+    def iter_network_stats(self):
+        """Iterate over all network statistics samples, oldest first"""
+        return self._iter_rows('''SELECT * FROM network_stats ORDER BY timestamp''')
+
+    def get_cached_scan(self, ip, max_age_hours=24):
+        """Get the lookup payload of the newest scan of an IP if it is younger than max_age_hours"""
+        c = self.conn.cursor()
+        
+        c.execute('''SELECT details FROM ip_scans 
+                    WHERE ip = ? AND details IS NOT NULL
+                      AND timestamp > datetime('now', 'localtime', ?)
+                    ORDER BY timestamp DESC LIMIT 1''',
+                    (ip, f'-{int(max_age_hours)} hours'))
+        
+        row = c.fetchone()
+        return json_loads(row['details']) if row is not None else None
+
     def get_recent_scans(self, limit=10):
         """Get recent IP scans"""
-        conn = sqlite3.connect(self.db_path)
-        c = conn.cursor()
-        
-        c.execute('''SELECT * FROM ip_scans 
-                    ORDER BY timestamp DESC LIMIT ?''', (limit,))
-        
-        columns = [description[0] for description in c.description]
-        results = [dict(zip(columns, row)) for row in c.fetchall()]
-        
-        conn.close()
-        return results
+        rows = self.conn.execute('''SELECT id, ip, country, city, isp, timestamp FROM ip_scans 
+                                    ORDER BY timestamp DESC LIMIT ?''', (limit,)).fetchall()
+        return [dict(row) for row in rows]
 
     def get_network_stats_history(self, limit=10):
         """Get network statistics history"""
-        conn = sqlite3.connect(self.db_path)
-        c = conn.cursor()
-        
-        c.execute('''SELECT * FROM network_stats 
-                    ORDER BY timestamp DESC LIMIT ?''', (limit,))
-        
-        columns = [description[0] for description in c.description]
-        results = [dict(zip(columns, row)) for row in c.fetchall()]
-        
-        conn.close()
-        return results
+        rows = self.conn.execute('''SELECT id, bytes_sent, bytes_recv, connections, timestamp
+                                    FROM network_stats 
+                                    ORDER BY timestamp DESC LIMIT ?''', (limit,)).fetchall()
+        return [dict(row) for row in rows]
 
     def clear_old_data(self, days=30):
         """Clear data older than specified days"""
-        conn = sqlite3.connect(self.db_path)
-        c = conn.cursor()
-        
-        c.execute('''DELETE FROM ip_scans 
-                    WHERE timestamp < datetime('now', '-? days')''', (days,))
-        
-        c.execute('''DELETE FROM network_stats 
-                    WHERE timestamp < datetime('now', '-? days')''', (days,))
-        
-        conn.commit()
-        conn.close()
+        # Timestamps are stored from datetime.now(), so compare in local time
+        modifier = f'-{int(days)} days'
+        with self._transaction() as c:
+            c.execute('''DELETE FROM ip_scans 
+                        WHERE timestamp < datetime('now', 'localtime', ?)''', (modifier,))
+            
+            c.execute('''DELETE FROM network_stats 
+                        WHERE timestamp < datetime('now', 'localtime', ?)''', (modifier,))
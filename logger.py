@@ -1,8 +1,11 @@
+import atexit
+import functools
 import logging
 import logging.handlers
 import os
+import queue
+import time
 from pathlib import Path
-from datetime import datetime
 
 class Logger:
     def __init__(self, config):
@@ -12,6 +15,11 @@ class Logger:
 
     def setup_logger(self):
         """Set up the logger with configuration"""
+        # Handlers live on the root logger, so only attach them once per process
+        root = logging.getLogger()
+        if getattr(root, "_nettrackr_configured", False):
+            return
+
         if not self.log_dir.exists():
             self.log_dir.mkdir(parents=True)
 
@@ -31,15 +39,22 @@ class Logger:
         )
         file_handler.setFormatter(formatter)
 
+        # Hand file writes to a background thread so callers never block on disk
+        log_queue = queue.SimpleQueue()
+        queue_handler = logging.handlers.QueueHandler(log_queue)
+        listener = logging.handlers.QueueListener(log_queue, file_handler)
+        listener.start()
+        atexit.register(listener.stop)
+
         # Set up console handler
         console_handler = logging.StreamHandler()
         console_handler.setFormatter(formatter)
 
         # Configure root logger
-        logger = logging.getLogger()
-        logger.setLevel(log_level)
-        logger.addHandler(file_handler)
-        logger.addHandler(console_handler)
+        root.setLevel(log_level)
+        root.addHandler(queue_handler)
+        root.addHandler(console_handler)
+        root._nettrackr_configured = True
 
     def get_logger(self, name):
         """Get a logger instance with the specified name"""
@@ -50,14 +65,20 @@ class LoggerDecorator:
         self.logger = logger
 
     def __call__(self, func):
+        @functools.wraps(func)
         def wrapper(*args, **kwargs):
-            start_time = datetime.now()
-            self.logger.debug(f"Starting {func.__name__} with args: {args}, kwargs: {kwargs}")
+            # Skip timing and message formatting entirely unless DEBUG is on
+            debug = self.logger.isEnabledFor(logging.DEBUG)
+            if debug:
+                start_time = time.perf_counter()
+                self.logger.debug("Starting %s", func.__name__)
             try:
                 result = func(*args, **kwargs)
-                self.logger.debug(f"Completed {func.__name__} in {datetime.now() - start_time}")
-                return result
-            except Exception as e:
-                self.logger.error(f"Error in {func.__name__}: {str(e)}", exc_info=True)
+            except Exception:
+                self.logger.exception("Error in %s", func.__name__)
                 raise
+            if debug:
+                self.logger.debug("Completed %s in %.3fms", func.__name__,
+                                  (time.perf_counter() - start_time) * 1000)
+            return result
         return wrapper
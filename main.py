@@ -16,36 +16,49 @@ __copyright__ = "Copyright (c) 2025 XyphosCyber Security Solutions"
 
 import sys
 import os
-from pathlib import Path
 import asyncio
+import logging
 import signal
-from datetime import datetime
 
 # Internal imports
 from config import Config
 from logger import Logger, LoggerDecorator
 from monitor import SystemMonitor
 from updater import UpdateChecker
-from data_manager import DataManager
+from data_manager import DataManager, EXPORT_FORMATS
 from report_generator import ReportGenerator
 from utils import (
     setup_terminal,
     create_spinner,
     create_progress_bar,
-    format_table,
     format_size,
-    format_time
+    format_metrics,
+    yaml_dump
 )
 
 # External imports
-from rich.console import Console
+from rich.console import Console, Group
 from rich.panel import Panel
 from rich.text import Text
-import requests
-import dns.resolver
+import aiohttp
+import dns.asyncresolver
 import psutil
-from termcolor import colored
-import yaml
+
+_LOG = logging.getLogger(__name__)
+_trace = LoggerDecorator(_LOG)
+
+MENU_OPTIONS = [
+    "1. 🔍 Fetch IP Address",
+    "2. 🌍 Fetch IP Details",
+    "3. 📊 Network Analysis",
+    "4. 🔒 Security Scan",
+    "5. 📡 DNS Information",
+    "6. 💾 Export Data",
+    "7. ℹ️ System Information",
+    "8. 📜 View History",
+    "9. ⚙️ Configuration",
+    "10. ❌ Exit"
+]
 
 class NetTrackr:
     def __init__(self):
@@ -54,9 +67,19 @@ class NetTrackr:
         self.log = self.logger.get_logger(__name__)
         self.monitor = SystemMonitor(self.config.config, self.logger)
         self.updater = UpdateChecker(self.config.config, self.logger)
-        self.data_manager = DataManager(self.config.config, self.logger)
+        self.data_manager = DataManager(*os.path.split(self.config.get("database", "path")))
         self.report_generator = ReportGenerator(self.config.config, self.logger)
         self.console = Console()
+        self._http = None
+        self._welcome_renderable = self._build_welcome_renderable()
+        # These do not change while the process is running
+        self._static_sysinfo = {
+            "os": sys.platform,
+            "python_version": sys.version,
+            "cpu_count": psutil.cpu_count(logical=True),
+            "memory": format_size(psutil.virtual_memory().total),
+            "disk": format_size(psutil.disk_usage('/').total)
+        }
         self.running = True
         self.setup_signal_handlers()
 
@@ -71,15 +94,31 @@ class NetTrackr:
         self.cleanup()
         sys.exit(0)
 
-    @LoggerDecorator(logging.getLogger(__name__))
+    @_trace
     def cleanup(self):
         """Cleanup resources before shutdown"""
         self.running = False
         self.monitor.stop()
+        self.data_manager.close()
         self.log.info("Cleanup completed")
 
-    def display_welcome_message(self):
-        """Display welcome message with ASCII art"""
+    async def _http_get_json(self, url):
+        """GET a URL and decode the JSON body using the shared HTTP session"""
+        if self._http is None or self._http.closed:
+            self._http = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(total=self.config.get("api", "timeout"))
+            )
+        async with self._http.get(url) as response:
+            return await response.json(content_type=None)
+
+    async def close_http_session(self):
+        """Close the shared HTTP session"""
+        if self._http is not None and not self._http.closed:
+            await self._http.close()
+        self._http = None
+
+    def _build_welcome_renderable(self):
+        """Build the welcome banner and menu options as a single renderable"""
         welcome_text = """
 ███╗   ██╗███████╗████████╗████████╗██████╗  █████╗  ██████╗██╗  ██╗██████╗ 
 ████╗  ██║██╔════╝╚══██╔══╝╚══██╔══╝██╔══██╗██╔══██╗██╔════╝██║ ██╔╝██╔══██╗
@@ -88,8 +127,15 @@ class NetTrackr:
 ██║ ╚████║███████╗   ██║      ██║   ██║  ██║██║  ██║╚██████╗██║  ██╗██║  ██║
 ╚═╝  ╚═══╝╚══════╝   ╚═╝      ╚═╝   ╚═╝  ╚═╝╚═╝  ╚═╝ ╚═════╝╚═╝  ╚═╝╚═╝  ╚═╝
         """
-        self.console.print(Panel(Text(welcome_text, style="bold blue")))
-        self.console.print(Panel(Text("Professional Network Intelligence Tool", style="cyan")))
+        return Group(
+            Panel(Text(welcome_text, style="bold blue")),
+            Panel(Text("Professional Network Intelligence Tool", style="cyan")),
+            *[Text(option, style="cyan") for option in MENU_OPTIONS]
+        )
+
+    def display_welcome_message(self):
+        """Display welcome message with ASCII art and the menu options"""
+        self.console.print(self._welcome_renderable)
 
     async def check_for_updates(self):
         """Check for available updates"""
@@ -101,76 +147,100 @@ class NetTrackr:
                      f"Visit: {update_info['update_url']}", style="yellow")
             ))
 
-    @LoggerDecorator(logging.getLogger(__name__))
+    @_trace
     async def fetch_ip_address(self):
         """Fetch current IP address"""
         try:
-            async with create_spinner("Fetching IP address..."):
-                response = requests.get('https://api.ipify.org?format=json')
-                ip_data = response.json()
+            with create_spinner("Fetching IP address..."):
+                ip_data = await self._http_get_json('https://api.ipify.org?format=json')
                 return ip_data['ip']
         except Exception as e:
             self.log.error(f"Error fetching IP address: {str(e)}")
             raise
 
-    @LoggerDecorator(logging.getLogger(__name__))
+    @_trace
     async def fetch_ip_details(self, ip_address):
         """Fetch detailed information about an IP address"""
+        geolocation = self.config.get("features", "geolocation") or {}
+        cache_enabled = geolocation.get("cache_results", True)
         try:
-            async with create_spinner("Fetching IP details..."):
-                response = requests.get(f'http://ip-api.com/json/{ip_address}')
-                details = response.json()
+            if cache_enabled:
+                cached = self.data_manager.get_cached_scan(
+                    ip_address, geolocation.get("cache_duration_hours", 24)
+                )
+                if cached:
+                    return cached
+
+            with create_spinner("Fetching IP details..."):
+                details = await self._http_get_json(f'http://ip-api.com/json/{ip_address}')
                 
-                # Save to database
-                self.data_manager.save_ip_scan(ip_address, details)
+                # Save the full payload to the database, which also serves as the lookup cache
+                if details.get("status") != "fail":
+                    self.data_manager.save_scans([details])
                 
                 return details
         except Exception as e:
             self.log.error(f"Error fetching IP details: {str(e)}")
             raise
 
-    @LoggerDecorator(logging.getLogger(__name__))
+    @_trace
     async def scan_ports(self, target, ports=None):
         """Scan ports on target"""
         if ports is None:
             ports = self.config.get("features", {}).get("port_scan", {}).get("default_ports", [80, 443])
         
-        results = []
-        with create_progress_bar() as progress:
-            task = progress.add_task("[cyan]Scanning ports...", total=len(ports))
-            
-            for port in ports:
+        timeout = self.config.get("features", {}).get("port_scan", {}).get("timeout", 1)
+        sem = asyncio.Semaphore(self.config.get("security", "max_concurrent_scans") or 64)
+        open_connection = asyncio.open_connection
+        wait_for = asyncio.wait_for
+
+        async def probe(port):
+            async with sem:
                 try:
-                    reader, writer = await asyncio.wait_for(
-                        asyncio.open_connection(target, port),
-                        timeout=self.config.get("features", {}).get("port_scan", {}).get("timeout", 1)
+                    reader, writer = await wait_for(
+                        open_connection(target, port),
+                        timeout=timeout
                     )
                     writer.close()
                     await writer.wait_closed()
-                    results.append({"port": port, "state": "open"})
+                    return {"port": port, "state": "open"}
                 except:
-                    results.append({"port": port, "state": "closed"})
+                    return {"port": port, "state": "closed"}
+
+        results = []
+        with create_progress_bar() as progress:
+            task = progress.add_task("[cyan]Scanning ports...", total=len(ports))
+            
+            for probe_done in asyncio.as_completed([probe(port) for port in ports]):
+                results.append(await probe_done)
                 progress.update(task, advance=1)
         
+        # Report in the order the ports were requested, not completion order
+        order = {port: i for i, port in enumerate(ports)}
+        results.sort(key=lambda r: order[r["port"]])
         return results
 
-    @LoggerDecorator(logging.getLogger(__name__))
+    @_trace
     async def fetch_dns_info(self, domain):
         """Fetch DNS information for a domain"""
-        results = {}
-        record_types = self.config.get("features", {}).get("dns_lookup", {}).get("record_types", ["A"])
+        dns_config = self.config.get("features", {}).get("dns_lookup", {})
+        record_types = dns_config.get("record_types", ["A"])
+        timeout = dns_config.get("timeout", 2)
+        resolve = dns.asyncresolver.resolve
+
+        async def query(record_type):
+            try:
+                answers = await resolve(domain, record_type, lifetime=timeout)
+                return record_type, [str(rdata) for rdata in answers]
+            except Exception as e:
+                return record_type, [f"Error: {str(e)}"]
         
-        async with create_spinner("Fetching DNS information..."):
-            for record_type in record_types:
-                try:
-                    answers = dns.resolver.resolve(domain, record_type)
-                    results[record_type] = [str(rdata) for rdata in answers]
-                except Exception as e:
-                    results[record_type] = [f"Error: {str(e)}"]
+        with create_spinner("Fetching DNS information..."):
+            results = dict(await asyncio.gather(*(query(rt) for rt in record_types)))
         
         return results
 
-    @LoggerDecorator(logging.getLogger(__name__))
+    @_trace
     def generate_report(self, data, format="json"):
         """Generate a report in the specified format"""
         try:
@@ -185,22 +255,9 @@ class NetTrackr:
             self.console.clear()
             self.display_welcome_message()
             
-            options = [
-                "1. 🔍 Fetch IP Address",
-                "2. 🌍 Fetch IP Details",
-                "3. 📊 Network Analysis",
-                "4. 🔒 Security Scan",
-                "5. 📡 DNS Information",
-                "6. 💾 Export Data",
-                "7. ℹ️ System Information",
-                "8. 📜 View History",
-                "9. ⚙️ Configuration",
-                "10. ❌ Exit"
-            ]
-            
-            for option in options:
-                self.console.print(Text(option, style="cyan"))
-            
+            # Prompts stay on the main thread: a worker blocked in input() would keep
+            # the process alive after Ctrl-C. Nothing else runs on the loop while the
+            # menu waits, so the menu's own quick DB and report calls run inline too
             choice = input("\nEnter your choice (1-10): ")
             
             try:
@@ -211,23 +268,23 @@ class NetTrackr:
                 elif choice == "2":
                     ip = await self.fetch_ip_address()
                     details = await self.fetch_ip_details(ip)
-                    self.console.print(Panel(Text(yaml.dump(details), style="green")))
+                    self.console.print(Panel(Text(yaml_dump(details), style="green")))
                 
                 elif choice == "3":
                     metrics = self.monitor.get_latest_metrics()
-                    self.console.print(Panel(Text(yaml.dump(metrics), style="green")))
+                    self.console.print(Panel(Text(yaml_dump(format_metrics(metrics)), style="green")))
                 
                 elif choice == "4":
                     ip = await self.fetch_ip_address()
                     ports_input = input("Enter ports to scan (comma-separated) or press Enter for default: ")
                     ports = [int(p.strip()) for p in ports_input.split(",")] if ports_input else None
                     results = await self.scan_ports(ip, ports)
-                    self.console.print(Panel(Text(yaml.dump(results), style="green")))
+                    self.console.print(Panel(Text(yaml_dump(results), style="green")))
                 
                 elif choice == "5":
                     domain = input("Enter domain name: ")
                     dns_info = await self.fetch_dns_info(domain)
-                    self.console.print(Panel(Text(yaml.dump(dns_info), style="green")))
+                    self.console.print(Panel(Text(yaml_dump(dns_info), style="green")))
                 
                 elif choice == "6":
                     formats = self.config.get("export", {}).get("available_formats", ["json"])
@@ -236,26 +293,29 @@ class NetTrackr:
                         print(f"{i}. {fmt}")
                     fmt_choice = int(input("\nChoose format: ")) - 1
                     if 0 <= fmt_choice < len(formats):
-                        data = self.data_manager.get_all_data()
-                        report_path = self.generate_report(data, formats[fmt_choice])
+                        fmt = formats[fmt_choice]
+                        if fmt in EXPORT_FORMATS:
+                            # Stream the scan history straight from the cursor into the file
+                            report_path = self.data_manager.export_data(self.data_manager.iter_scans(), fmt)
+                        else:
+                            # HTML and PDF go through the report generator, one section per scan
+                            scans = {f"scan {row['id']}": row for row in self.data_manager.iter_scans()}
+                            report_path = self.generate_report({"scans": scans}, fmt)
                         self.console.print(Panel(Text(f"Report generated: {report_path}", style="green")))
                 
                 elif choice == "7":
                     system_info = {
-                        "os": sys.platform,
-                        "python_version": sys.version,
-                        "cpu_count": psutil.cpu_count(),
-                        "memory": format_size(psutil.virtual_memory().total),
-                        "disk": format_size(psutil.disk_usage('/').total)
+                        **self._static_sysinfo,
+                        "memory_available": format_size(psutil.virtual_memory().available)
                     }
-                    self.console.print(Panel(Text(yaml.dump(system_info), style="green")))
+                    self.console.print(Panel(Text(yaml_dump(system_info), style="green")))
                 
                 elif choice == "8":
-                    history = self.data_manager.get_scan_history()
-                    self.console.print(Panel(Text(yaml.dump(history), style="green")))
+                    history = self.data_manager.get_recent_scans()
+                    self.console.print(Panel(Text(yaml_dump(history), style="green")))
                 
                 elif choice == "9":
-                    self.console.print(Panel(Text(yaml.dump(self.config.config), style="green")))
+                    self.console.print(Panel(Text(self.config.dumped(), style="green")))
                 
                 elif choice == "10":
                     self.cleanup()
@@ -273,7 +333,10 @@ async def main():
     app = NetTrackr()
     await app.check_for_updates()
     app.monitor.start()
-    await app.main_menu()
+    try:
+        await app.main_menu()
+    finally:
+        await app.close_http_session()
 
 if __name__ == "__main__":
     setup_terminal()
@@ -2,11 +2,115 @@ import psutil
 import time
 import threading
 from datetime import datetime, timedelta
-import json
 from pathlib import Path
-import platform
 import os
-from utils import get_data_dir, format_size
+import queue
+from concurrent.futures import Future, as_completed, TimeoutError as FuturesTimeoutError
+from collections import namedtuple
+from utils import get_data_dir, SYSTEM, json_dumps, json_loads
+
+# Most buffers a single writev() call accepts
+try:
+    _IOV_MAX = os.sysconf("SC_IOV_MAX")
+except (AttributeError, ValueError, OSError):
+    _IOV_MAX = -1
+if _IOV_MAX <= 0:
+    _IOV_MAX = 1024
+
+_VirtualMemory = namedtuple("_VirtualMemory", "total available used free percent")
+_SwapMemory = namedtuple("_SwapMemory", "total used free percent")
+_NetIO = namedtuple("_NetIO", "bytes_sent bytes_recv packets_sent packets_recv errin errout dropin dropout")
+
+class _ProcStats:
+    """Read CPU, memory and network counters directly from /proc on Linux
+
+    Exposes the subset of the psutil call signatures SystemMonitor uses, so it
+    can be swapped in for the per-tick psutil calls. The /proc files are opened
+    once and re-read with pread() at offset 0 on every call.
+    """
+
+    _BUF_SIZE = 1 << 16
+
+    def __init__(self):
+        self._stat = os.open("/proc/stat", os.O_RDONLY)
+        self._meminfo = os.open("/proc/meminfo", os.O_RDONLY)
+        self._net_dev = os.open("/proc/net/dev", os.O_RDONLY)
+        self._last_cpu = None
+        # The monitor thread and on-demand reads from the menu share the last CPU sample
+        self._cpu_lock = threading.Lock()
+
+    def close(self):
+        for fd in (self._stat, self._meminfo, self._net_dev):
+            os.close(fd)
+
+    def _read(self, fd):
+        """Read a whole /proc file; /proc/net/dev can outgrow one buffer on hosts with many interfaces"""
+        data = os.pread(fd, self._BUF_SIZE, 0)
+        if len(data) < self._BUF_SIZE:
+            return data
+        # Keep reading until a short read marks the end of the file
+        chunks = [data]
+        offset = len(data)
+        while len(data) == self._BUF_SIZE:
+            data = os.pread(fd, self._BUF_SIZE, offset)
+            chunks.append(data)
+            offset += len(data)
+        return b"".join(chunks)
+
+    def cpu_percent(self, interval=None):
+        # First line: cpu user nice system idle iowait irq softirq steal guest guest_nice
+        with self._cpu_lock:
+            fields = [int(x) for x in os.pread(self._stat, self._BUF_SIZE, 0).split(b"\n", 1)[0].split()[1:9]]
+            total = sum(fields)
+            idle = fields[3] + fields[4]
+            last, self._last_cpu = self._last_cpu, (total, idle)
+        if last is None or total <= last[0]:
+            return 0.0
+        busy = (total - last[0]) - (idle - last[1])
+        return round(100.0 * busy / (total - last[0]), 1)
+
+    def _meminfo_values(self):
+        values = {}
+        for line in self._read(self._meminfo).split(b"\n"):
+            key, _, rest = line.partition(b":")
+            if rest:
+                values[key] = int(rest.split()[0]) * 1024
+        return values
+
+    def virtual_memory(self):
+        mem = self._meminfo_values()
+        total = mem[b"MemTotal"]
+        free = mem[b"MemFree"]
+        cached = mem.get(b"Cached", 0) + mem.get(b"SReclaimable", 0)
+        used = total - free - cached - mem.get(b"Buffers", 0)
+        if used < 0:
+            used = total - free
+        available = mem.get(b"MemAvailable", free + cached)
+        percent = round(100.0 * (total - available) / total, 1) if total else 0.0
+        return _VirtualMemory(total, available, used, free, percent)
+
+    def swap_memory(self):
+        mem = self._meminfo_values()
+        total = mem.get(b"SwapTotal", 0)
+        free = mem.get(b"SwapFree", 0)
+        used = total - free
+        percent = round(100.0 * used / total, 1) if total else 0.0
+        return _SwapMemory(total, used, free, percent)
+
+    def net_io_counters(self, pernic=True):
+        counters = {}
+        # Skip the two header lines
+        for line in self._read(self._net_dev).split(b"\n")[2:]:
+            name, _, rest = line.partition(b":")
+            if not rest:
+                continue
+            f = rest.split()
+            # Receive: bytes packets errs drop ...; transmit starts at column 8
+            counters[name.strip().decode()] = _NetIO(
+                int(f[8]), int(f[0]), int(f[9]), int(f[1]),
+                int(f[2]), int(f[10]), int(f[3]), int(f[11])
+            )
+        return counters
 
 class SystemMonitor:
     def __init__(self, config, logger):
@@ -17,8 +121,55 @@ class SystemMonitor:
         self.metrics = config.get("features", {}).get("monitoring", {}).get("metrics", [])
         self.data_dir = Path(get_data_dir()) / "monitoring"
         self.running = False
+        self.monitor_thread = None
+        self._stop_event = threading.Event()
         self._setup_data_directory()
 
+        # Bind the psutil calls made every tick once
+        self._cpu_percent = psutil.cpu_percent
+        self._cpu_freq = psutil.cpu_freq
+        self._virtual_memory = psutil.virtual_memory
+        self._swap_memory = psutil.swap_memory
+        self._disk_usage = psutil.disk_usage
+        self._net_io_counters = psutil.net_io_counters
+
+        # On Linux read the hot counters straight from /proc instead
+        self._proc = None
+        if SYSTEM == 'Linux':
+            try:
+                self._proc = _ProcStats()
+            except OSError as e:
+                self.logger.debug(f"/proc not available, using psutil: {str(e)}")
+        if self._proc is not None:
+            self._cpu_percent = self._proc.cpu_percent
+            self._virtual_memory = self._proc.virtual_memory
+            self._swap_memory = self._proc.swap_memory
+            self._net_io_counters = self._proc.net_io_counters
+
+        # Slow-changing readings (CPU topology, partitions, interfaces) are cached
+        # as (fetched_at, value) pairs and only re-read once their TTL has passed
+        self._static_cache = {}
+        self._static_ttl = 300
+        self.network_interval = config.get("features", {}).get("monitoring", {}).get("network_interval_seconds", 300)
+        # In-flight disk usage queries by mountpoint; a hung mount keeps its one query.
+        # Queries run on long-lived daemon workers so a stuck statvfs cannot block exit
+        self._disk_futures = {}
+        self._disk_queue = queue.SimpleQueue()
+        self._disk_workers = 0
+        self._disk_max_workers = 8
+        self._disk_timeout = 2
+
+        # Today's metrics file; samples are appended by a background writer thread
+        self._metrics_path = None
+        self._metrics_date = None
+        self._metrics_day = None
+        self._write_q = queue.SimpleQueue()
+        self._writer_thread = None
+        self._writer_timeout = 2
+
+        # Prime the non-blocking CPU percentage so the first sample is meaningful
+        self._cpu_percent(interval=None)
+
     def _setup_data_directory(self):
         """Set up the monitoring data directory"""
         if not self.data_dir.exists():
@@ -28,6 +179,7 @@ class SystemMonitor:
         """Start the monitoring thread"""
         if self.monitoring_enabled and not self.running:
             self.running = True
+            self._stop_event.clear()
             self.monitor_thread = threading.Thread(target=self._monitor_loop)
             self.monitor_thread.daemon = True
             self.monitor_thread.start()
@@ -36,132 +188,352 @@ class SystemMonitor:
     def stop(self):
         """Stop the monitoring thread"""
         self.running = False
+        self._stop_event.set()
+        if self.monitor_thread is not None:
+            # A tick is bounded by the disk timeout and the final flush by the
+            # writer timeout, so this wait is short
+            self.monitor_thread.join(timeout=self._disk_timeout + self._writer_timeout + 1)
+        # If the thread is still finishing a tick it closes the readers itself on exit
+        if self.monitor_thread is None or not self.monitor_thread.is_alive():
+            self._close_proc()
         self.logger.info("System monitoring stopped")
 
+    def _close_proc(self):
+        """Close the /proc readers and go back to the psutil calls"""
+        proc, self._proc = self._proc, None
+        if proc is not None:
+            self._cpu_percent = psutil.cpu_percent
+            self._virtual_memory = psutil.virtual_memory
+            self._swap_memory = psutil.swap_memory
+            self._net_io_counters = psutil.net_io_counters
+            proc.close()
+
     def _monitor_loop(self):
         """Main monitoring loop"""
+        # Schedule ticks against the monotonic clock so collection time does not add drift
+        next_deadline = time.monotonic()
         while self.running:
             try:
+                # The file name only changes at midnight, so only format it then
+                now_local = time.localtime()
+                day = (now_local.tm_year, now_local.tm_yday)
+                if day != self._metrics_day:
+                    self._metrics_date = time.strftime("%Y%m%d", now_local)
+                    self._metrics_path = self._metrics_file(self._metrics_date)
+                    self._metrics_day = day
                 metrics = self._collect_metrics()
                 self._save_metrics(metrics)
-                time.sleep(self.interval)
             except Exception as e:
+                # Collection no longer blocks, so just retry on the next tick
                 self.logger.error(f"Error in monitoring loop: {str(e)}")
-                time.sleep(5)  # Wait before retrying
+
+            next_deadline += self.interval
+            now = time.monotonic()
+            # Under overload skip missed ticks rather than running them back to back
+            while next_deadline < now:
+                next_deadline += self.interval
+            self._stop_event.wait(next_deadline - now)
+        self._stop_writer()
+        self._close_proc()
+
+    def _stop_writer(self):
+        """Let the writer drain what is queued, then wait briefly for it to exit"""
+        writer, self._writer_thread = self._writer_thread, None
+        if writer is not None:
+            self._write_q.put(None)
+            writer.join(timeout=self._writer_timeout)
+
+    def _metrics_file(self, date_str):
+        """Get the metrics file path for a day"""
+        return self.data_dir / f"metrics_{date_str}.jsonl"
+
+    def _writer_loop(self):
+        """Append queued samples to their files, batching whatever has piled up"""
+        fd, fd_path = None, None
+        running = True
+        while running:
+            batch = [self._write_q.get()]
+            while True:
+                try:
+                    batch.append(self._write_q.get_nowait())
+                except queue.Empty:
+                    break
+
+            pending = []
+            for item in batch:
+                if item is None:
+                    running = False
+                    break
+                path, data = item
+                if path != fd_path:
+                    if pending:
+                        fd = self._write_all(fd, pending)
+                        pending = []
+                    if fd is not None:
+                        os.close(fd)
+                    fd, fd_path = None, None
+                    try:
+                        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+                        fd_path = path
+                    except OSError as e:
+                        # Drop this sample; the next one retries the open
+                        self.logger.error(f"Error saving metrics: {str(e)}")
+                        continue
+                pending.append(data)
+            if pending:
+                fd = self._write_all(fd, pending)
+                if fd is None:
+                    fd_path = None
+        if fd is not None:
+            os.close(fd)
+
+    def _write_all(self, fd, buffers):
+        """Write buffers to fd with as few syscalls as possible
+
+        Returns fd, or None after closing it if the write failed so the
+        caller reopens the file for the next batch.
+        """
+        try:
+            if hasattr(os, "writev"):
+                # writev() fails with EINVAL when given more than IOV_MAX buffers
+                for i in range(0, len(buffers), _IOV_MAX):
+                    chunk = buffers[i:i + _IOV_MAX]
+                    written = os.writev(fd, chunk)
+                    if written < sum(map(len, chunk)):
+                        data = b"".join(chunk)[written:]
+                        while data:
+                            data = data[os.write(fd, data):]
+            else:
+                data = b"".join(buffers)
+                while data:
+                    data = data[os.write(fd, data):]
+            return fd
+        except OSError as e:
+            self.logger.error(f"Error saving metrics: {str(e)}")
+            os.close(fd)
+            return None
+
+    def _submit_disk_usage(self, mountpoint):
+        """Queue a disk usage query for the worker threads"""
+        future = Future()
+        self._disk_queue.put((future, mountpoint))
+        return future
+
+    def _ensure_disk_workers(self, count):
+        """Start daemon disk workers until at least count are running"""
+        while self._disk_workers < count:
+            threading.Thread(target=self._disk_worker, daemon=True).start()
+            self._disk_workers += 1
+
+    def _disk_worker(self):
+        """Run queued disk usage queries"""
+        while True:
+            future, mountpoint = self._disk_queue.get()
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(self._disk_usage(mountpoint))
+            except Exception as e:
+                future.set_exception(e)
+
+    def _cached(self, key, ttl, loader):
+        """Get loader() memoized under key for ttl seconds"""
+        fetched_at, value = self._static_cache.get(key, (float("-inf"), None))
+        now = time.monotonic()
+        if now - fetched_at > ttl:
+            value = loader()
+            self._static_cache[key] = (now, value)
+        return value
+
+    def _disk_partitions(self):
+        """Get mounted partitions, cached for a few minutes"""
+        return self._cached("partitions", self._static_ttl, lambda: psutil.disk_partitions(all=False))
+
+    def _static_cpu_info(self):
+        """Get CPU counts and frequency range, cached for a few minutes"""
+        return self._cached("cpu", self._static_ttl, self._read_cpu_info)
+
+    def _read_cpu_info(self):
+        """Read CPU counts and frequency range"""
+        info = {
+            "count_physical": psutil.cpu_count(logical=False),
+            "count_logical": psutil.cpu_count(logical=True),
+            "min_freq": None,
+            "max_freq": None
+        }
+        # CPU frequency might not be available on all systems
+        try:
+            cpu_freq = self._cpu_freq()
+            if cpu_freq:
+                info["min_freq"] = cpu_freq.min
+                info["max_freq"] = cpu_freq.max
+        except Exception as e:
+            self.logger.debug(f"CPU frequency not available: {str(e)}")
+        return info
+
+    def _static_net_interfaces(self):
+        """Get interface addresses and link stats, cached for network_interval_seconds"""
+        return self._cached("network", self.network_interval, self._read_net_interfaces)
+
+    def _read_net_interfaces(self):
+        """Read interface addresses and link stats"""
+        net_if_addrs = psutil.net_if_addrs()
+        net_if_stats = psutil.net_if_stats()
+        
+        interfaces = {}
+        for interface, addrs in net_if_addrs.items():
+            addresses = []
+            for addr in addrs:
+                addr_info = {
+                    "family": str(addr.family),
+                    "address": addr.address
+                }
+                if addr.netmask:
+                    addr_info["netmask"] = addr.netmask
+                if hasattr(addr, "broadcast") and addr.broadcast:
+                    addr_info["broadcast"] = addr.broadcast
+                addresses.append(addr_info)
+
+            stats = {}
+            if interface in net_if_stats:
+                if_stats = net_if_stats[interface]
+                stats = {
+                    "speed": if_stats.speed,
+                    "mtu": if_stats.mtu,
+                    "up": if_stats.isup,
+                    "duplex": str(if_stats.duplex)
+                }
+
+            interfaces[interface] = {"addresses": addresses, "stats": stats}
+
+        return interfaces
 
     def _collect_metrics(self):
         """Collect system metrics"""
         metrics = {
             "timestamp": datetime.now().isoformat(),
-            "system": platform.system(),
+            "system": SYSTEM,
             "metrics": {}
         }
 
         try:
             if "cpu" in self.metrics:
+                cpu_info = self._static_cpu_info()
                 cpu_metrics = {
-                    "percent": psutil.cpu_percent(interval=1),
+                    "percent": self._cpu_percent(interval=None),
                     "count": {
-                        "physical": psutil.cpu_count(logical=False),
-                        "logical": psutil.cpu_count(logical=True)
+                        "physical": cpu_info["count_physical"],
+                        "logical": cpu_info["count_logical"]
                     }
                 }
                 
-                # CPU frequency might not be available on all systems
-                try:
-                    cpu_freq = psutil.cpu_freq()
-                    if cpu_freq:
+                # Only the current frequency changes between ticks
+                if cpu_info["max_freq"] is not None:
+                    try:
+                        cpu_freq = self._cpu_freq()
                         cpu_metrics["frequency"] = {
-                            "current": cpu_freq.current,
-                            "min": cpu_freq.min,
-                            "max": cpu_freq.max
+                            "current": cpu_freq.current if cpu_freq else None,
+                            "min": cpu_info["min_freq"],
+                            "max": cpu_info["max_freq"]
                         }
-                except Exception as e:
-                    self.logger.debug(f"CPU frequency not available: {str(e)}")
+                    except Exception as e:
+                        self.logger.debug(f"CPU frequency not available: {str(e)}")
                 
                 metrics["metrics"]["cpu"] = cpu_metrics
 
+            # Byte values are stored raw; formatting is left to the presentation layer
             if "memory" in self.metrics:
-                memory = psutil.virtual_memory()
+                memory = self._virtual_memory()
                 metrics["metrics"]["memory"] = {
-                    "total": format_size(memory.total),
-                    "available": format_size(memory.available),
-                    "used": format_size(memory.used),
-                    "free": format_size(memory.free),
+                    "total": memory.total,
+                    "available": memory.available,
+                    "used": memory.used,
+                    "free": memory.free,
                     "percent": memory.percent
                 }
 
                 # Add swap memory if available
                 try:
-                    swap = psutil.swap_memory()
+                    swap = self._swap_memory()
                     metrics["metrics"]["swap"] = {
-                        "total": format_size(swap.total),
-                        "used": format_size(swap.used),
-                        "free": format_size(swap.free),
+                        "total": swap.total,
+                        "used": swap.used,
+                        "free": swap.free,
                         "percent": swap.percent
                     }
                 except Exception as e:
                     self.logger.debug(f"Swap memory info not available: {str(e)}")
 
             if "disk" in self.metrics:
-                disk_metrics = {}
-                for partition in psutil.disk_partitions(all=False):
+                partitions = self._disk_partitions()
+                usages = {}
+                # statvfs on a network mount can hang, so query mounts in parallel with a deadline
+                futures = {}
+                disk_futures = {}
+                for partition in partitions:
+                    mountpoint = partition.mountpoint
+                    if mountpoint in disk_futures:
+                        continue
+                    pending = self._disk_futures.get(mountpoint)
+                    if pending is not None and not pending.done():
+                        # Still stuck since an earlier tick; do not start another query behind it
+                        disk_futures[mountpoint] = pending
+                        self.logger.debug(f"Timed out getting disk usage for {mountpoint}")
+                        continue
+                    future = self._submit_disk_usage(mountpoint)
+                    disk_futures[mountpoint] = future
+                    futures[future] = partition
+                self._disk_futures = disk_futures
+                # Mounts stuck since an earlier tick each tie up a worker, so size for them on top
+                stuck = len(disk_futures) - len(futures)
+                self._ensure_disk_workers(stuck + min(self._disk_max_workers, len(futures)))
+                if futures:
                     try:
-                        usage = psutil.disk_usage(partition.mountpoint)
-                        disk_metrics[partition.mountpoint] = {
-                            "device": partition.device,
-                            "fstype": partition.fstype,
-                            "total": format_size(usage.total),
-                            "used": format_size(usage.used),
-                            "free": format_size(usage.free),
-                            "percent": usage.percent
-                        }
-                    except Exception as e:
-                        self.logger.debug(f"Could not get disk usage for {partition.mountpoint}: {str(e)}")
+                        for future in as_completed(futures, timeout=self._disk_timeout):
+                            partition = futures[future]
+                            try:
+                                usages[partition.mountpoint] = future.result()
+                            except Exception as e:
+                                self.logger.debug(f"Could not get disk usage for {partition.mountpoint}: {str(e)}")
+                    except FuturesTimeoutError:
+                        for future, partition in futures.items():
+                            if not future.done():
+                                self.logger.debug(f"Timed out getting disk usage for {partition.mountpoint}")
+
+                disk_metrics = {}
+                for partition in partitions:
+                    usage = usages.get(partition.mountpoint)
+                    if usage is None:
+                        continue
+                    disk_metrics[partition.mountpoint] = {
+                        "device": partition.device,
+                        "fstype": partition.fstype,
+                        "total": usage.total,
+                        "used": usage.used,
+                        "free": usage.free,
+                        "percent": usage.percent
+                    }
                 metrics["metrics"]["disk"] = disk_metrics
 
             if "network" in self.metrics:
-                # Get network interfaces
-                net_if_addrs = psutil.net_if_addrs()
-                net_if_stats = psutil.net_if_stats()
-                net_io = psutil.net_io_counters(pernic=True)
+                # Interface addresses and link stats change rarely; IO counters every tick
+                interfaces = self._static_net_interfaces()
+                net_io = self._net_io_counters(pernic=True)
                 
                 network_metrics = {}
-                for interface, addrs in net_if_addrs.items():
+                for interface, static_metrics in interfaces.items():
                     interface_metrics = {
-                        "addresses": [],
-                        "stats": {},
+                        "addresses": static_metrics["addresses"],
+                        "stats": static_metrics["stats"],
                         "io": {}
                     }
                     
-                    # Add addresses
-                    for addr in addrs:
-                        addr_info = {
-                            "family": str(addr.family),
-                            "address": addr.address
-                        }
-                        if addr.netmask:
-                            addr_info["netmask"] = addr.netmask
-                        if hasattr(addr, "broadcast") and addr.broadcast:
-                            addr_info["broadcast"] = addr.broadcast
-                        interface_metrics["addresses"].append(addr_info)
-                    
-                    # Add interface stats
-                    if interface in net_if_stats:
-                        stats = net_if_stats[interface]
-                        interface_metrics["stats"] = {
-                            "speed": stats.speed,
-                            "mtu": stats.mtu,
-                            "up": stats.isup,
-                            "duplex": str(stats.duplex)
-                        }
-                    
-                    # Add IO counters
+                    # Add IO counters as raw numbers so consumers can compute deltas
                     if interface in net_io:
                         io = net_io[interface]
                         interface_metrics["io"] = {
-                            "bytes_sent": format_size(io.bytes_sent),
-                            "bytes_recv": format_size(io.bytes_recv),
+                            "bytes_sent": io.bytes_sent,
+                            "bytes_recv": io.bytes_recv,
                             "packets_sent": io.packets_sent,
                             "packets_recv": io.packets_recv,
                             "errin": io.errin,
@@ -180,21 +552,15 @@ class SystemMonitor:
         return metrics
 
     def _save_metrics(self, metrics):
-        """Save metrics to a file"""
-        date_str = datetime.now().strftime("%Y%m%d")
-        metrics_file = self.data_dir / f"metrics_{date_str}.json"
-        
+        """Queue metrics to be appended to today's JSON Lines file"""
         try:
-            if metrics_file.exists():
-                with open(metrics_file, 'r') as f:
-                    data = json.load(f)
-            else:
-                data = []
-            
-            data.append(metrics)
-            
-            with open(metrics_file, 'w') as f:
-                json.dump(data, f, indent=2)
+            if self._metrics_path is None:
+                self._metrics_date = time.strftime("%Y%m%d")
+                self._metrics_path = self._metrics_file(self._metrics_date)
+            if self._writer_thread is None:
+                self._writer_thread = threading.Thread(target=self._writer_loop, daemon=True)
+                self._writer_thread.start()
+            self._write_q.put((self._metrics_path, json_dumps(metrics) + b"\n"))
         except Exception as e:
             self.logger.error(f"Error saving metrics: {str(e)}")
 
@@ -202,16 +568,75 @@ class SystemMonitor:
         """Get the latest collected metrics"""
         return self._collect_metrics()
 
-    def get_metrics_history(self, days=1):
-        """Get metrics history for the specified number of days"""
-        history = []
-        for i in range(days):
-            date_str = (datetime.now() - timedelta(days=i)).strftime("%Y%m%d")
-            metrics_file = self.data_dir / f"metrics_{date_str}.json"
-            if metrics_file.exists():
+    def _reverse_lines(self, path, chunk_size=1 << 16):
+        """Yield the non-empty lines of a file from last to first"""
+        with open(path, 'rb') as f:
+            pos = f.seek(0, os.SEEK_END)
+            tail = b''
+            while pos > 0:
+                step = min(chunk_size, pos)
+                pos -= step
+                f.seek(pos)
+                lines = (f.read(step) + tail).split(b'\n')
+                # The first piece may be the end of a line that starts in an earlier block
+                tail = lines[0]
+                for line in reversed(lines[1:]):
+                    if line.strip():
+                        yield line
+            if tail.strip():
+                yield tail
+
+    def _legacy_metrics_file(self, date_str):
+        """Get the path of a day's metrics from before JSON Lines, stored as one JSON array"""
+        return self.data_dir / f"metrics_{date_str}.json"
+
+    def _iter_day(self, date_str):
+        """Yield a day's stored samples newest first"""
+        metrics_file = self._metrics_file(date_str)
+        if metrics_file.exists():
+            try:
+                for line in self._reverse_lines(metrics_file):
+                    try:
+                        yield json_loads(line)
+                    except ValueError as e:
+                        # A torn line (e.g. from a crash mid-write) only costs that one sample
+                        self.logger.debug(f"Skipping unreadable line in {metrics_file}: {str(e)}")
+            except OSError as e:
+                self.logger.error(f"Error reading metrics history: {str(e)}")
+
+        # Samples written before the switch to JSON Lines predate everything above; read them as-is
+        legacy_file = self._legacy_metrics_file(date_str)
+        if legacy_file.exists():
+            try:
+                with open(legacy_file, 'rb') as f:
+                    samples = json_loads(f.read())
+            except (OSError, ValueError) as e:
+                self.logger.error(f"Error reading metrics history: {str(e)}")
+                return
+            if isinstance(samples, list):
+                yield from reversed(samples)
+
+    def iter_metrics_history(self, days=1, since=None, limit=None):
+        """Iterate over stored metrics newest first, stopping at since or after limit samples"""
+        today = datetime.now()
+        date_strs = [(today - timedelta(days=i)).strftime("%Y%m%d") for i in range(days)]
+        count = 0
+        for date_str in date_strs:
+            for metrics in self._iter_day(date_str):
+                if limit is not None and count >= limit:
+                    return
                 try:
-                    with open(metrics_file, 'r') as f:
-                        history.extend(json.load(f))
-                except Exception as e:
-                    self.logger.error(f"Error reading metrics history: {str(e)}")
+                    timestamp = datetime.fromisoformat(metrics["timestamp"])
+                except (ValueError, TypeError, KeyError) as e:
+                    self.logger.debug(f"Skipping sample without a valid timestamp: {str(e)}")
+                    continue
+                if since is not None and timestamp < since:
+                    return
+                yield metrics
+                count += 1
+
+    def get_metrics_history(self, days=1, since=None, limit=None):
+        """Get metrics history for the specified number of days, oldest first"""
+        history = list(self.iter_metrics_history(days, since=since, limit=limit))
+        history.reverse()
         return history
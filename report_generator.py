@@ -1,12 +1,46 @@
-import json
 import csv
-import yaml
 from datetime import datetime
 from pathlib import Path
-from prettytable import PrettyTable
-import base64
-import matplotlib.pyplot as plt
 import io
+from utils import format_metrics, yaml_dump, json_dumps
+
+_SECTION_CLOSE = "</div>\n"
+
+_HTML_HEAD = """
+        <!DOCTYPE html>
+        <html>
+        <head>
+            <title>NetTrackr Report</title>
+            <style>
+                body { font-family: Arial, sans-serif; margin: 20px; }
+                .container { max-width: 1200px; margin: 0 auto; }
+                .header { background-color: #2c3e50; color: white; padding: 20px; }
+                .section { margin: 20px 0; padding: 20px; border: 1px solid #ddd; }
+                .chart { margin: 20px 0; }
+                table { width: 100%; border-collapse: collapse; }
+                th, td { padding: 8px; border: 1px solid #ddd; }
+                th { background-color: #f5f5f5; }
+            </style>
+        </head>
+        <body>
+            <div class="container">
+                <div class="header">
+                    <h1>NetTrackr Report</h1>
+"""
+
+_HTML_HEADER_CLOSE = """                </div>
+"""
+
+_HTML_CHARTS_OPEN = """                <div class="section">
+                    <h2>Charts</h2>
+"""
+
+_HTML_FOOT = """
+                </div>
+            </div>
+        </body>
+        </html>
+"""
 
 class ReportGenerator:
     def __init__(self, config, logger):
@@ -26,6 +60,9 @@ class ReportGenerator:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             report_name = f"nettrackr_report_{timestamp}"
 
+        # Monitor samples hold raw byte counts; every format shows them human-readable
+        data = format_metrics(data)
+
         try:
             if format == "json":
                 return self._generate_json(data, report_name)
@@ -46,8 +83,8 @@ class ReportGenerator:
     def _generate_json(self, data, report_name):
         """Generate JSON report"""
         file_path = self.export_dir / f"{report_name}.json"
-        with open(file_path, 'w') as f:
-            json.dump(data, f, indent=2)
+        with open(file_path, 'wb') as f:
+            f.write(json_dumps(data, indent=True))
         return file_path
 
     def _generate_csv(self, data, report_name):
@@ -67,7 +104,7 @@ class ReportGenerator:
         """Generate YAML report"""
         file_path = self.export_dir / f"{report_name}.yaml"
         with open(file_path, 'w') as f:
-            yaml.dump(data, f, default_flow_style=False)
+            yaml_dump(data, f)
         return file_path
 
     def _generate_html(self, data, report_name):
@@ -77,40 +114,15 @@ class ReportGenerator:
         # Generate charts
         charts = self._generate_charts(data)
         
-        html_content = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <title>NetTrackr Report</title>
-            <style>
-                body {{ font-family: Arial, sans-serif; margin: 20px; }}
-                .container {{ max-width: 1200px; margin: 0 auto; }}
-                .header {{ background-color: #2c3e50; color: white; padding: 20px; }}
-                .section {{ margin: 20px 0; padding: 20px; border: 1px solid #ddd; }}
-                .chart {{ margin: 20px 0; }}
-                table {{ width: 100%; border-collapse: collapse; }}
-                th, td {{ padding: 8px; border: 1px solid #ddd; }}
-                th {{ background-color: #f5f5f5; }}
-            </style>
-        </head>
-        <body>
-            <div class="container">
-                <div class="header">
-                    <h1>NetTrackr Report</h1>
-                    <p>Generated: {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}</p>
-                </div>
-                {self._dict_to_html(data)}
-                <div class="section">
-                    <h2>Charts</h2>
-                    {charts}
-                </div>
-            </div>
-        </body>
-        </html>
-        """
-        
-        with open(file_path, 'w') as f:
-            f.write(html_content)
+        # Stream the document straight to the file instead of building it in memory
+        with open(file_path, 'w', buffering=1 << 16) as f:
+            f.write(_HTML_HEAD)
+            f.write(f'                    <p>Generated: {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}</p>\n')
+            f.write(_HTML_HEADER_CLOSE)
+            self._dict_to_html(data, out=f)
+            f.write(_HTML_CHARTS_OPEN)
+            f.write(charts)
+            f.write(_HTML_FOOT)
         return file_path
 
     def _generate_pdf(self, data, report_name):
@@ -129,26 +141,42 @@ class ReportGenerator:
 
     def _flatten_dict(self, d, parent_key='', sep='_'):
         """Flatten nested dictionary"""
-        items = []
-        for k, v in d.items():
-            new_key = f"{parent_key}{sep}{k}" if parent_key else k
-            if isinstance(v, dict):
-                items.extend(self._flatten_dict(v, new_key, sep=sep).items())
+        flat = {}
+        # Depth-first walk with an explicit stack of item iterators keeps key order
+        stack = [(parent_key, iter(d.items()))]
+        while stack:
+            prefix, items = stack[-1]
+            for k, v in items:
+                new_key = f"{prefix}{sep}{k}" if prefix else k
+                if isinstance(v, dict):
+                    stack.append((new_key, iter(v.items())))
+                    break
+                flat[new_key] = v
             else:
-                items.append((new_key, v))
-        return dict(items)
-
-    def _dict_to_html(self, data, level=2):
-        """Convert dictionary to HTML representation"""
-        html = []
-        for key, value in data.items():
-            if isinstance(value, dict):
-                html.append(f"<div class='section'><h{level}>{key}</h{level}>")
-                html.append(self._dict_to_html(value, level + 1))
-                html.append("</div>")
+                stack.pop()
+        return flat
+
+    def _dict_to_html(self, data, out=None, level=2):
+        """Convert dictionary to HTML representation, writing into out if given"""
+        buf = io.StringIO() if out is None else out
+        write = buf.write
+        # Pre-order walk with an explicit stack of item iterators; a section is
+        # closed when its iterator is exhausted
+        stack = [(iter(data.items()), level)]
+        while stack:
+            items, lvl = stack[-1]
+            for key, value in items:
+                if isinstance(value, dict):
+                    write(f"<div class='section'><h{lvl}>{key}</h{lvl}>\n")
+                    stack.append((iter(value.items()), lvl + 1))
+                    break
+                write(f"<p><strong>{key}:</strong> {value}</p>\n")
             else:
-                html.append(f"<p><strong>{key}:</strong> {value}</p>")
-        return "\n".join(html)
+                stack.pop()
+                if stack:
+                    write(_SECTION_CLOSE)
+        if out is None:
+            return buf.getvalue()
 
     def _generate_charts(self, data):
         """Generate charts from data"""
@@ -157,23 +185,28 @@ class ReportGenerator:
         try:
             # Example: Generate system metrics chart if available
             if "metrics" in data:
-                plt.figure(figsize=(10, 6))
+                # Use the object-oriented API on the Agg canvas directly, bypassing pyplot
+                # and its GUI backend probing; only reports with charts pay the import
+                import base64
+                from matplotlib.figure import Figure
+                from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+                fig = Figure(figsize=(10, 6))
+                ax = fig.subplots()
                 metrics = data["metrics"]
                 if "cpu" in metrics and "percent" in metrics["cpu"]:
-                    plt.plot(["CPU Usage"], [metrics["cpu"]["percent"]], 'bo-', label='CPU')
+                    ax.bar(["CPU Usage"], [metrics["cpu"]["percent"]], color='b', label='CPU')
                 if "memory" in metrics and "percent" in metrics["memory"]:
-                    plt.plot(["Memory Usage"], [metrics["memory"]["percent"]], 'ro-', label='Memory')
-                plt.title("System Resource Usage")
-                plt.ylabel("Percentage")
-                plt.legend()
+                    ax.bar(["Memory Usage"], [metrics["memory"]["percent"]], color='r', label='Memory')
+                ax.set_title("System Resource Usage")
+                ax.set_ylabel("Percentage")
+                ax.legend()
                 
                 # Convert plot to base64 string
                 buf = io.BytesIO()
-                plt.savefig(buf, format='png')
-                buf.seek(0)
-                img_str = base64.b64encode(buf.read()).decode()
+                FigureCanvasAgg(fig).print_png(buf)
+                img_str = base64.b64encode(buf.getvalue()).decode()
                 charts_html.append(f'<img src="data:image/png;base64,{img_str}" />')
-                plt.close()
         
         except Exception as e:
             self.logger.error(f"Error generating charts: {str(e)}")
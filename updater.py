@@ -1,10 +1,17 @@
+import functools
 import requests
-import json
+from requests.adapters import HTTPAdapter
 from datetime import datetime, timedelta
 from pathlib import Path
 import pkg_resources
 import subprocess
 import sys
+from utils import json_dumps, json_loads
+
+@functools.lru_cache(maxsize=32)
+def _parse_version(version):
+    """Parse a dotted version string into a tuple of ints"""
+    return tuple(int(x) for x in version.split('.'))
 
 class UpdateChecker:
     def __init__(self, config, logger):
@@ -13,30 +20,42 @@ class UpdateChecker:
         self.version_file = Path("version.json")
         self.current_version = "1.0.0"
         self.last_check_file = Path("data/update_check.json")
+        self._session = requests.Session()
+        self._session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=1))
         self._load_version()
 
     def _load_version(self):
         """Load current version information"""
         if self.version_file.exists():
             try:
-                with open(self.version_file, 'r') as f:
-                    data = json.load(f)
+                with open(self.version_file, 'rb') as f:
+                    data = json_loads(f.read())
                     self.current_version = data.get('version', self.current_version)
             except Exception as e:
                 self.logger.error(f"Error loading version file: {str(e)}")
 
-    def _save_last_check(self):
-        """Save the timestamp of the last update check"""
+    def _load_last_check(self):
+        """Load the stored result of the last update check"""
+        try:
+            with open(self.last_check_file, 'rb') as f:
+                return json_loads(f.read())
+        except Exception:
+            return {}
+
+    def _save_last_check(self, etag=None, release=None):
+        """Save the timestamp, ETag and release info of the last update check"""
         if not self.last_check_file.parent.exists():
             self.last_check_file.parent.mkdir(parents=True)
 
         data = {
             'last_check': datetime.now().isoformat(),
-            'version': self.current_version
+            'version': self.current_version,
+            'etag': etag,
+            'release': release
         }
         
-        with open(self.last_check_file, 'w') as f:
-            json.dump(data, f)
+        with open(self.last_check_file, 'wb') as f:
+            f.write(json_dumps(data))
 
     def _should_check_update(self):
         """Determine if we should check for updates"""
@@ -47,13 +66,12 @@ class UpdateChecker:
             return True
 
         try:
-            with open(self.last_check_file, 'r') as f:
-                data = json.load(f)
-                last_check = datetime.fromisoformat(data['last_check'])
-                check_interval = timedelta(
-                    days=self.config.get("updates", {}).get("check_interval_days", 7)
-                )
-                return datetime.now() - last_check > check_interval
+            data = self._load_last_check()
+            last_check = datetime.fromisoformat(data['last_check'])
+            check_interval = timedelta(
+                days=self.config.get("updates", {}).get("check_interval_days", 7)
+            )
+            return datetime.now() - last_check > check_interval
         except Exception:
             return True
 
@@ -63,22 +81,40 @@ class UpdateChecker:
             return None
 
         try:
+            last_check = self._load_last_check()
+            headers = {}
+            if last_check.get('etag') and last_check.get('release'):
+                headers['If-None-Match'] = last_check['etag']
+
             # This is a placeholder URL - replace with actual update check endpoint
-            response = requests.get(
+            response = self._session.get(
                 "https://api.github.com/repos/yourusername/nettrackr/releases/latest",
+                headers=headers,
                 timeout=5
             )
-            if response.status_code == 200:
-                latest_version = response.json().get('tag_name', '').lstrip('v')
-                self._save_last_check()
-                
-                if self._compare_versions(latest_version, self.current_version) > 0:
-                    return {
-                        'current_version': self.current_version,
-                        'latest_version': latest_version,
-                        'update_url': response.json().get('html_url'),
-                        'release_notes': response.json().get('body')
-                    }
+            if response.status_code == 304:
+                # Release unchanged since the last check, reuse what we stored
+                release = last_check['release']
+                self._save_last_check(last_check['etag'], release)
+            elif response.status_code == 200:
+                data = response.json()
+                release = {
+                    'tag_name': data.get('tag_name', ''),
+                    'html_url': data.get('html_url'),
+                    'body': data.get('body')
+                }
+                self._save_last_check(response.headers.get('ETag'), release)
+            else:
+                return None
+
+            latest_version = release['tag_name'].lstrip('v')
+            if self._compare_versions(latest_version, self.current_version) > 0:
+                return {
+                    'current_version': self.current_version,
+                    'latest_version': latest_version,
+                    'update_url': release['html_url'],
+                    'release_notes': release['body']
+                }
         except Exception as e:
             self.logger.error(f"Error checking for updates: {str(e)}")
         
@@ -86,17 +122,12 @@ class UpdateChecker:
 
     def _compare_versions(self, version1, version2):
         """Compare two version strings"""
-        v1_parts = [int(x) for x in version1.split('.')]
-        v2_parts = [int(x) for x in version2.split('.')]
-        
-        for i in range(max(len(v1_parts), len(v2_parts))):
-            v1 = v1_parts[i] if i < len(v1_parts) else 0
-            v2 = v2_parts[i] if i < len(v2_parts) else 0
-            if v1 > v2:
-                return 1
-            elif v1 < v2:
-                return -1
-        return 0
+        v1_parts, v2_parts = _parse_version(version1), _parse_version(version2)
+        # Pad with zeros so that e.g. 1.2 and 1.2.0 compare equal
+        width = max(len(v1_parts), len(v2_parts))
+        v1_parts += (0,) * (width - len(v1_parts))
+        v2_parts += (0,) * (width - len(v2_parts))
+        return (v1_parts > v2_parts) - (v1_parts < v2_parts)
 
     def update_dependencies(self):
         """Update project dependencies"""
@@ -1,29 +1,76 @@
 import sys
 import time
 import threading
-import itertools
+import functools
 import os
 import platform
 import shutil
+from datetime import date
 from contextlib import contextmanager
 from rich.progress import Progress, SpinnerColumn, TextColumn
 from rich.console import Console
 import humanize
+import yaml
 from termcolor import colored
 
+# Prefer the libyaml C bindings when PyYAML was built with them
+try:
+    from yaml import CSafeLoader as YamlLoader, CSafeDumper as YamlDumper
+except ImportError:
+    from yaml import SafeLoader as YamlLoader, SafeDumper as YamlDumper
+
+def _json_default(obj):
+    """Serialize dates as ISO 8601 like orjson does natively; anything else is an error"""
+    if isinstance(obj, date):
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+# Prefer the fastest JSON library available; json_dumps always returns bytes
+try:
+    import orjson
+
+    def json_dumps(obj, indent=False):
+        """Serialize obj to JSON bytes"""
+        return orjson.dumps(obj, default=_json_default, option=orjson.OPT_INDENT_2 if indent else 0)
+
+    json_loads = orjson.loads
+except ImportError:
+    try:
+        import ujson as _json
+    except ImportError:
+        import json as _json
+
+    def json_dumps(obj, indent=False):
+        """Serialize obj to JSON bytes"""
+        if indent:
+            return _json.dumps(obj, indent=2, default=_json_default).encode()
+        return _json.dumps(obj, default=_json_default).encode()
+
+    json_loads = _json.loads
+
+# The platform cannot change while we are running
+SYSTEM = platform.system()
+IS_WINDOWS = SYSTEM == 'Windows'
+
+SPINNER_FRAMES = ('⢿', '⣻', '⣽', '⣾', '⣷', '⣯', '⣟', '⡿')
+
 class LoadingAnimation:
     def __init__(self, desc="Loading...", color="cyan"):
         self.desc = desc
         self.color = color
         self.done = False
         self.thread = None
+        # The colored description never changes, so render it once
+        self._prefix = colored(desc, color)
 
     def animate(self):
-        for c in itertools.cycle(['⢿', '⣻', '⣽', '⣾', '⣷', '⣯', '⣟', '⡿']):
-            if self.done:
-                break
-            sys.stdout.write(f'\r{colored(self.desc, self.color)} {c}')
+        sys.stdout.write(f'\r{self._prefix}  ')
+        i = 0
+        while not self.done:
+            # Only redraw the spinner character, not the whole line
+            sys.stdout.write(f'\b{SPINNER_FRAMES[i % len(SPINNER_FRAMES)]}')
             sys.stdout.flush()
+            i += 1
             time.sleep(0.1)
         sys.stdout.write('\r' + ' ' * (len(self.desc) + 2) + '\r')
 
@@ -36,6 +83,11 @@ class LoadingAnimation:
         if self.thread is not None:
             self.thread.join()
 
+def _color_codes(color):
+    """Get the (prefix, suffix) escape codes termcolor wraps text in"""
+    prefix, _, suffix = colored("\0", color).partition("\0")
+    return prefix, suffix
+
 class ProgressBar:
     def __init__(self, total, prefix='Progress:', suffix='Complete', decimals=1, length=50, fill='█', color='cyan'):
         self.total = total
@@ -45,17 +97,21 @@ class ProgressBar:
         self.length = length
         self.fill = fill
         self.color = color
+        # Everything that does not depend on the iteration is computed once
+        self._color_prefix, self._color_suffix = _color_codes(color)
+        self._dashes = '-' * length
+        self._percent_format = "{0:." + str(decimals) + "f}"
 
     def update(self, iteration):
-        percent = ("{0:." + str(self.decimals) + "f}").format(100 * (iteration / float(self.total)))
+        percent = self._percent_format.format(100 * (iteration / float(self.total)))
         filled_length = int(self.length * iteration // self.total)
-        bar = self.fill * filled_length + '-' * (self.length - filled_length)
-        print(f'\r{self.prefix} |{colored(bar, self.color)}| {percent}% {self.suffix}', end='\r')
+        bar = self.fill * filled_length + self._dashes[filled_length:]
+        print(f'\r{self.prefix} |{self._color_prefix}{bar}{self._color_suffix}| {percent}% {self.suffix}', end='\r')
         if iteration == self.total:
             print()
 
 def clear_screen():
-    os.system('cls' if platform.system() == 'Windows' else 'clear')
+    os.system('cls' if IS_WINDOWS else 'clear')
 
 def print_header(text, color="yellow", width=50):
     print(colored("=" * width, color))
@@ -73,26 +129,63 @@ def print_table(headers, data, color="cyan"):
         for i, cell in enumerate(row):
             widths[i] = max(widths[i], len(str(cell)))
 
-    # Print headers
+    # Build the whole table and color each line without calling colored() per row
     header_line = " | ".join(h.ljust(w) for h, w in zip(headers, widths))
-    print(colored(header_line, color))
-    print(colored("-" * len(header_line), color))
-
-    # Print data
+    header_prefix, header_suffix = _color_codes(color)
+    row_prefix, row_suffix = _color_codes("white")
+    lines = [
+        f"{header_prefix}{header_line}{header_suffix}",
+        f"{header_prefix}{'-' * len(header_line)}{header_suffix}",
+    ]
     for row in data:
         row_str = " | ".join(str(cell).ljust(w) for cell, w in zip(row, widths))
-        print(colored(row_str, "white"))
+        lines.append(f"{row_prefix}{row_str}{row_suffix}")
+    print("\n".join(lines))
 
 def format_bytes(bytes):
     """Format bytes to human readable format"""
-    for unit in ['B', 'KB', 'MB', 'GB', 'TB']:
+    for unit in ['B', 'KB', 'MB', 'GB']:
         if bytes < 1024:
             return f"{bytes:.2f} {unit}"
         bytes /= 1024
+    return f"{bytes:.2f} TB"
+
+def yaml_load(stream):
+    """Parse YAML with the fastest available safe loader"""
+    return yaml.load(stream, Loader=YamlLoader)
+
+def yaml_dump(data, stream=None):
+    """Dump data as block-style YAML with the fastest available safe dumper"""
+    return yaml.dump(data, stream, Dumper=YamlDumper, default_flow_style=False)
+
+# Byte counts in monitor samples, by section
+_SIZE_FIELDS = frozenset({"total", "available", "used", "free"})
+_IO_FIELDS = frozenset({"bytes_sent", "bytes_recv"})
+
+def _format_byte_fields(values, fields):
+    """Get a copy of values with the given byte-count fields formatted"""
+    return {k: format_size(v) if k in fields and isinstance(v, int) else v for k, v in values.items()}
+
+def format_metrics(sample):
+    """Get a copy of a monitor sample with its raw byte counts formatted for display"""
+    metrics = sample.get("metrics") if isinstance(sample, dict) else None
+    if not isinstance(metrics, dict):
+        return sample
+    formatted = dict(metrics)
+    for section in ("memory", "swap"):
+        if isinstance(metrics.get(section), dict):
+            formatted[section] = _format_byte_fields(metrics[section], _SIZE_FIELDS)
+    if isinstance(metrics.get("disk"), dict):
+        formatted["disk"] = {mount: _format_byte_fields(usage, _SIZE_FIELDS)
+                             for mount, usage in metrics["disk"].items()}
+    if isinstance(metrics.get("network"), dict):
+        formatted["network"] = {iface: {**info, "io": _format_byte_fields(info.get("io", {}), _IO_FIELDS)}
+                                for iface, info in metrics["network"].items()}
+    return {**sample, "metrics": formatted}
 
 def setup_terminal():
     """Setup terminal for both Windows and Linux"""
-    if platform.system() == 'Windows':
+    if IS_WINDOWS:
         try:
             import colorama
             colorama.init()
@@ -146,9 +239,10 @@ def format_time(seconds):
     """Format time in seconds to human readable format"""
     return humanize.naturaldelta(seconds)
 
+@functools.lru_cache(maxsize=None)
 def is_root():
     """Check if the script is running with root/admin privileges"""
-    if platform.system() == 'Windows':
+    if IS_WINDOWS:
         try:
             import ctypes
             return ctypes.windll.shell32.IsUserAnAdmin() != 0
@@ -157,23 +251,26 @@ def is_root():
     else:
         return os.geteuid() == 0  # For Linux/Unix
 
+@functools.lru_cache(maxsize=None)
 def get_config_dir():
     """Get the appropriate config directory for the platform"""
-    if platform.system() == 'Windows':
+    if IS_WINDOWS:
         return os.path.join(os.getenv('APPDATA'), 'NetTrackr')
     else:
         return os.path.join(os.path.expanduser('~'), '.config', 'nettrackr')
 
+@functools.lru_cache(maxsize=None)
 def get_data_dir():
     """Get the appropriate data directory for the platform"""
-    if platform.system() == 'Windows':
+    if IS_WINDOWS:
         return os.path.join(os.getenv('LOCALAPPDATA'), 'NetTrackr')
     else:
         return os.path.join(os.path.expanduser('~'), '.local', 'share', 'nettrackr')
 
+@functools.lru_cache(maxsize=None)
 def get_cache_dir():
     """Get the appropriate cache directory for the platform"""
-    if platform.system() == 'Windows':
+    if IS_WINDOWS:
         return os.path.join(os.getenv('LOCALAPPDATA'), 'NetTrackr', 'Cache')
     else:
         return os.path.join(os.path.expanduser('~'), '.cache', 'nettrackr')